@@ -0,0 +1,36 @@
+#!/home/kiosk/fridge-kiosk/venv/bin/python3
+"""
+Fridge Kiosk - Template precompiler
+Compiles the main page and plugin views into Python modules so the
+backend does not parse them on every start. Run again after editing
+a template.
+"""
+
+import sys
+import shutil
+from pathlib import Path
+
+# Add parent directory to sys.path to make imports work from backend/
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+from backend.utils.templates import create_template_env, create_source_loader, is_page_template, COMPILED_TEMPLATES_DIR
+
+
+def main():
+    """Main entry point"""
+    # Start from an empty directory so removed templates don't linger
+    if COMPILED_TEMPLATES_DIR.exists():
+        shutil.rmtree(COMPILED_TEMPLATES_DIR)
+
+    # Always compile from source, never from an older compiled copy
+    source_env = create_template_env(create_source_loader())
+    source_env.compile_templates(
+        str(COMPILED_TEMPLATES_DIR),
+        filter_func=is_page_template,
+        zip=None,
+        log_function=print
+    )
+
+
+if __name__ == "__main__":
+    main()
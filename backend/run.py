@@ -5,24 +5,36 @@ Launches a simple HTTP server and manages plugins
 """
 
 import os
+import re
 import sys
 import json
 import logging
 import argparse
 import importlib.util
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
 import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
 import jinja2
-import traceback
-import datetime
-import google.oauth2.credentials
-import google_auth_oauthlib.flow
-import urllib.parse
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 import inspect
+import hashlib
+import ipaddress
+import gzip
+import functools
+import signal
+import stat
+import shutil
+import compileall
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Allow OAuth2 over HTTP for development
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
@@ -30,23 +42,34 @@ os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 # Add parent directory to sys.path to make imports work after moving to backend/
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
-from backend.utils.config import load_config, get_plugin_path, get_env, setup_logging
+from backend.utils.config import load_config, get_plugin_path, get_env, setup_logging, stop_logging, get_system_log_level, get_system_config, CONFIG_DIR, PLUGINS_DIR
+from backend.utils.templates import create_template_env, create_source_loader, compiled_templates_current, TEMPLATES_DIR, COMPILED_TEMPLATES_DIR
 
-# Initialize Jinja2 template environment
-template_loader = jinja2.FileSystemLoader(searchpath=str(project_root / "backend/templates"))
-template_env = jinja2.Environment(loader=template_loader)
+logger = logging.getLogger(__name__)
 
-# Add custom filters
-def datetime_fromtimestamp(timestamp):
-    """Convert Unix timestamp to datetime object"""
-    return datetime.datetime.fromtimestamp(timestamp)
+# Important paths
+BACKEND_DIR = project_root / 'backend'
+STATIC_DIR = BACKEND_DIR / 'static'
 
-def strftime(dt, format_str):
-    """Format datetime object using strftime"""
-    return dt.strftime(format_str)
+source_loader = create_source_loader()
+template_loader = source_loader
+precompiled_templates_stale = False
+if COMPILED_TEMPLATES_DIR.is_dir():
+    if compiled_templates_current():
+        # Skip parsing on startup; templates added since the last precompile still load from source
+        template_loader = jinja2.ChoiceLoader([
+            jinja2.ModuleLoader(str(COMPILED_TEMPLATES_DIR)),
+            source_loader,
+        ])
+    else:
+        # Edited templates would otherwise be shadowed by their old compiled copies; main() warns about it
+        precompiled_templates_stale = True
+template_env = create_template_env(template_loader)
+# Compiled code of templates loaded from source survives restarts; main() enables it when the directory is writable
+TEMPLATE_CACHE_DIR = project_root / '.jinja_cache'
 
-template_env.filters['datetime_fromtimestamp'] = datetime_fromtimestamp
-template_env.filters['strftime'] = strftime
+# Compile the main page once at startup
+INDEX_TEMPLATE = template_env.get_template('index.html')
 
 # Load main config to get Google OAuth scopes
 main_config = load_config()
@@ -57,6 +80,233 @@ DEFAULT_SCOPES = [
     'https://www.googleapis.com/auth/photoslibrary.readonly'
 ]
 SCOPES = main_config.get('google', {}).get('oauth', {}).get('scopes', DEFAULT_SCOPES)
+CLIENT_SECRET_PATH = CONFIG_DIR / 'client_secret.json'
+
+# Plugins are imported and initialized in the background after startup; EAGER_PLUGINS=1 blocks until done
+EAGER_PLUGINS = get_env('EAGER_PLUGINS', '0') == '1'
+_plugin_load_locks = {}
+_plugin_module_locks = {}
+
+# Queued init of each plugin: plugin_name -> (plugin_info, future); kept out of plugin_info,
+# which the page serializes to JSON. Requests wait on it instead of queueing another init.
+_plugin_init_futures = {}
+_plugin_init_futures_lock = threading.Lock()
+
+# Imported plugin modules: plugin_name -> (main.py mtime_ns, module), and the plugin_info and
+# server config init() was last run for, so a reloaded module can be initialized the same way
+_plugin_modules = {}
+_plugin_inits = {}
+
+# Parsed plugin config.json files: path -> (mtime_ns, config), so plugin reloads only re-read edited files
+_plugin_configs = {}
+
+# API handlers resolved once per imported plugin: plugin_name -> {endpoint: (handler, takes_query)}
+_plugin_handlers = {}
+
+# Plugin init() calls are mostly network-bound, so they run side by side
+_plugin_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='plugin')
+# API handler calls bounded by apiTimeout get their own workers, so handlers that overrun can't delay init()
+_api_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='plugin-api')
+# Calls still running in the API pool: (function, plugin_name, endpoint, query) -> future,
+# so a poll that arrives while the previous call hangs waits on it instead of taking another worker
+_api_calls = {}
+_api_calls_lock = threading.Lock()
+# /api/batch waits at most this long for plugins without their own apiTimeout
+DEFAULT_BATCH_TIMEOUT = 30
+DEFAULT_INIT_TIMEOUT = 30
+
+# OAuth states issued by /authorize and not yet used: state -> monotonic issue time
+OAUTH_STATE_TTL = 600
+_oauth_states = {}
+_oauth_states_lock = threading.Lock()
+
+# Rendered main page: (plugins, token_exists, body, gzip_body) it was rendered from
+_index_page = None
+
+# Whether config/token.json exists, re-checked at most every TOKEN_CHECK_INTERVAL seconds
+TOKEN_PATH = CONFIG_DIR / 'token.json'
+TOKEN_CHECK_INTERVAL = 5
+_token_state = {'exists': False, 'checked_at': None}
+
+def token_file_exists():
+    """Return whether token.json exists without a stat on every page load"""
+    now = time.monotonic()
+    checked_at = _token_state['checked_at']
+    if checked_at is None or now - checked_at > TOKEN_CHECK_INTERVAL:
+        _token_state['exists'] = TOKEN_PATH.exists()
+        _token_state['checked_at'] = now
+    return _token_state['exists']
+
+# Cached plugin API responses keyed by (plugin_name, endpoint) -> (monotonic timestamp, body, etag)
+_api_cache = {}
+_api_cache_lock = threading.RLock()
+
+# Static file bodies kept in memory, least recently used first: file_path -> StaticEntry
+StaticEntry = namedtuple('StaticEntry', ['mtime', 'size', 'mimetype', 'body', 'gzip_body', 'etag', 'gzip_etag', 'last_modified', 'checked_at'])
+_static_cache = OrderedDict()
+_static_cache_lock = threading.Lock()
+STATIC_CACHE_MAX_ENTRIES = 256
+# Larger files are not kept in memory but sent straight from disk with sendfile
+STATIC_CACHE_MAX_FILE_SIZE = 1024 * 1024
+# Buffer size when such a file has to be copied through userspace instead
+STREAM_CHUNK_SIZE = 64 * 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Browsers may reuse static assets this long before revalidating with If-None-Match
+STATIC_CACHE_CONTROL = 'max-age=60'
+# Cached files are served without a stat for this many seconds after their last check
+STATIC_REVALIDATE_INTERVAL = 2
+
+# Routes matched in do_GET
+PLUGIN_API_ROUTE = re.compile(r'^/api/plugins/([^/]+)(?:/([^/]+))?/?$')
+CACHE_INVALIDATE_ROUTE = re.compile(r'^/api/cache/invalidate/([^/]+)/?$')
+
+# Fixed parts of plain-text error bodies, so error paths only encode the message
+ERROR_FILE_NOT_FOUND = b'File not found'
+ERROR_INTERNAL_PREFIX = b'Internal server error: '
+ERROR_RENDER_PREFIX = b'Error: '
+
+# Load the MIME type tables once at import instead of on the first request
+mimetypes.init()
+PLUGIN_PREFIX = 'plugins/'
+STATIC_PREFIX = 'static/'
+
+@functools.lru_cache(maxsize=4096)
+def resolve_static_path(path):
+    """Map URL path to file system path and MIME type"""
+    # Clean up the path
+    path = path.lstrip('/')
+    
+    # Check if this is a plugin resource
+    if path.startswith(PLUGIN_PREFIX):
+        parts = path.split('/')
+        if len(parts) >= 3:
+            plugin_name = parts[1]
+            resource = '/'.join(parts[2:])
+            file_path = get_plugin_path(plugin_name) / resource
+            logger.debug("Mapping plugin resource: %s -> %s", path, file_path)
+            return file_path, guess_mimetype(file_path)
+    
+    # For static files (including favicon)
+    if path.startswith(STATIC_PREFIX):
+        file_path = BACKEND_DIR / path
+        logger.debug("Mapping static file: %s -> %s", path, file_path)
+        return file_path, guess_mimetype(file_path)
+    
+    # For everything else, map to the templates directory
+    file_path = TEMPLATES_DIR / path
+    logger.debug("Mapping template file: %s -> %s", path, file_path)
+    return file_path, guess_mimetype(file_path)
+
+# Types of the assets the kiosk serves; independent of the host's /etc/mime.types
+EXTENSION_MIMETYPES = {
+    '.html': 'text/html',
+    '.css': 'text/css',
+    '.js': 'text/javascript',
+    '.json': 'application/json',
+    '.svg': 'image/svg+xml',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.ico': 'image/x-icon',
+    '.woff2': 'font/woff2',
+}
+
+def guess_mimetype(file_path):
+    """Return the MIME type for a file name, defaulting to application/octet-stream"""
+    mimetype = EXTENSION_MIMETYPES.get(file_path.suffix.lower())
+    if mimetype is None:
+        mimetype, _ = mimetypes.guess_type(str(file_path))
+    return mimetype or 'application/octet-stream'
+
+def get_recent_static_entry(file_path):
+    """Return the cached entry of a file checked against the disk within STATIC_REVALIDATE_INTERVAL"""
+    with _static_cache_lock:
+        entry = _static_cache.get(file_path)
+        if entry is not None and time.monotonic() - entry.checked_at < STATIC_REVALIDATE_INTERVAL:
+            _static_cache.move_to_end(file_path)
+            return entry
+    return None
+
+def get_static_entry(file_path, file_stat, mimetype):
+    """Return the cached body, gzip body and ETag of a static file, re-reading it when it changed"""
+    now = time.monotonic()
+    with _static_cache_lock:
+        entry = _static_cache.get(file_path)
+        if entry is not None and entry.mtime == file_stat.st_mtime and entry.size == file_stat.st_size:
+            entry = entry._replace(checked_at=now)
+            _static_cache[file_path] = entry
+            _static_cache.move_to_end(file_path)
+            return entry
+    
+    if file_stat.st_size > STATIC_CACHE_MAX_FILE_SIZE:
+        etag = '"%x-%x"' % (file_stat.st_mtime_ns, file_stat.st_size)
+        return StaticEntry(file_stat.st_mtime, file_stat.st_size, mimetype, None, None, etag, None,
+                           formatdate(file_stat.st_mtime, usegmt=True), now)
+    
+    with open(file_path, 'rb') as f:
+        body = f.read()
+    gzip_body = None
+    if mimetype.startswith(COMPRESSIBLE_TYPES):
+        gzip_body = gzip.compress(body)
+        if len(gzip_body) >= len(body):
+            gzip_body = None
+    digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+    etag = '"%s"' % digest
+    # Each content coding needs its own strong validator
+    gzip_etag = '"%s-gz"' % digest if gzip_body is not None else None
+    entry = StaticEntry(file_stat.st_mtime, file_stat.st_size, mimetype, body, gzip_body, etag, gzip_etag,
+                        formatdate(file_stat.st_mtime, usegmt=True), now)
+    
+    with _static_cache_lock:
+        _static_cache[file_path] = entry
+        _static_cache.move_to_end(file_path)
+        while len(_static_cache) > STATIC_CACHE_MAX_ENTRIES:
+            _static_cache.popitem(last=False)
+    return entry
+
+def warm_static_cache(plugins):
+    """Load the page's stylesheets, scripts and plugin assets into the static cache ahead of the first request"""
+    asset_dirs = [(TEMPLATES_DIR, ''), (STATIC_DIR, 'static/')]
+    asset_dirs += [(get_plugin_path(name) / 'static', f"plugins/{name}/static/") for name in plugins]
+    warmed = 0
+    for asset_dir, url_prefix in asset_dirs:
+        for dirpath, _, filenames in os.walk(asset_dir):
+            rel_dir = Path(dirpath).relative_to(asset_dir).as_posix()
+            for filename in filenames:
+                url_path = url_prefix + (filename if rel_dir == '.' else f"{rel_dir}/{filename}")
+                file_path, mimetype = resolve_static_path('/' + url_path)
+                try:
+                    file_stat = file_path.stat()
+                    if file_stat.st_size <= STATIC_CACHE_MAX_FILE_SIZE:
+                        get_static_entry(file_path, file_stat, mimetype)
+                        warmed += 1
+                except OSError as e:
+                    logger.debug("Could not preload %s: %s", file_path, e)
+    logger.debug("Preloaded %s static files", warmed)
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header (a list of tags or *) against an ETag, ignoring W/ prefixes"""
+    if if_none_match.strip() == '*':
+        return True
+    etag = etag[2:] if etag.startswith('W/') else etag
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+def json_bytes(obj):
+    """Serialize an API response to UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        try:
+            # Plugins sometimes key results by date or number, which the stdlib encoder also accepts
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types orjson rejects (e.g. integers wider than 64 bits) still go through the stdlib encoder
+            pass
+    return json.dumps(obj).encode('utf-8')
 
 def credentials_to_dict(credentials):
     """Convert Google Credentials object to a dictionary."""
@@ -71,244 +321,423 @@ def credentials_to_dict(credentials):
 
 def get_credentials():
     """Get valid credentials from token.json or return None."""
-    token_path = Path(project_root / 'config' / 'token.json')
-    if token_path.exists():
+    if TOKEN_PATH.exists():
         try:
-            with open(token_path, 'r') as token_file:
-                token_data = json.load(token_file)
-            logging.getLogger().debug("Successfully loaded token.json")
-            return google.oauth2.credentials.Credentials(**token_data)
+            token_data = json.loads(TOKEN_PATH.read_bytes())
+            logger.debug("Successfully loaded token.json")
+            # Google libraries are imported on first use to keep them out of startup
+            from google.oauth2.credentials import Credentials
+            return Credentials(**token_data)
         except Exception as e:
-            logging.getLogger().error(f"Error loading credentials: {e}")
-            logging.getLogger().debug(f"Token file path: {token_path}")
+            logger.error("Error loading credentials: %s", e)
+            logger.debug("Token file path: %s", TOKEN_PATH)
     else:
-        logging.getLogger().warning(f"token.json not found at {token_path}")
+        logger.warning("token.json not found at %s", TOKEN_PATH)
     return None
 
 class KioskHTTPRequestHandler(BaseHTTPRequestHandler):
     """Custom HTTP request handler for the kiosk"""
     
-    def __init__(self, *args, config=None, plugins=None, **kwargs):
-        self.config = config or {}
-        self.plugins = plugins or {}
-        self.root_dir = project_root
-        super().__init__(*args, **kwargs)
+    # Keep connections open between the page's polling requests; every response sets Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Close idle keep-alive connections so they don't hold one of the server's request slots
+    timeout = 15
+    # Buffer the response so headers and small bodies leave in a single send
+    wbufsize = 8192
     
     def log_message(self, format, *args):
         """Override the default logging to respect our logging configuration"""
-        # Only log if logging is not OFF
-        system_log_level = self.config.get('system', {}).get('logging', 'INFO').upper()
-        if system_log_level != 'OFF':
-            logging.getLogger().info("%s - %s",
-                        self.address_string(),
-                        format % args)
+        # Only log if logging is not OFF; formatting is left to the logger so filtered lines cost nothing
+        if self.server.system.logging != 'OFF':
+            logger.info("%s - " + format, self.client_address[0], *args)
     
     def log_error(self, format, *args):
         """Override error logging to respect our logging configuration"""
-        # Only log if logging is not OFF
-        system_log_level = self.config.get('system', {}).get('logging', 'INFO').upper()
-        if system_log_level != 'OFF':
-            logging.getLogger().error("%s - %s",
-                        self.address_string(),
-                        format % args)
+        # Only log if logging is not OFF; formatting is left to the logger so filtered lines cost nothing
+        if self.server.system.logging != 'OFF':
+            logger.error("%s - " + format, self.client_address[0], *args)
+    
+    # Exact paths and the method serving them; other paths are matched against route patterns
+    exact_routes = {
+        '/': 'serve_index',
+        '/index.html': 'serve_index',
+        '/authorize': 'serve_authorize',
+        '/api/batch': 'serve_api_batch',
+    }
+    # (compiled pattern, method) for /api/ paths; the method receives the pattern's groups
+    api_routes = (
+        (CACHE_INVALIDATE_ROUTE, 'serve_cache_invalidate'),
+        (PLUGIN_API_ROUTE, 'serve_plugin_api'),
+    )
     
     def do_GET(self):
         """Handle GET requests"""
         try:
-            # Parse URL path and query parameters
-            parsed_path = urlparse(self.path)
-            path = parsed_path.path
-            query = parse_qs(parsed_path.query)
+            # Split path and query parameters; most requests carry no query string
+            path, _, query_string = self.path.partition('?')
+            query = parse_qs(query_string) if query_string else {}
             
-            logging.getLogger().debug(f"Received GET request: {path} with query params: {query}")
-
-            # OAuth routes
-            if path == '/authorize' and 'code' not in query:
-                logging.getLogger().info("Handling OAuth authorization request")
-                self.handle_authorize()
-                return
-            elif path == '/authorize' and 'code' in query:
-                logging.getLogger().info("Handling OAuth callback")
-                self.handle_oauth2callback()
+            logger.debug("Received GET request: %s with query params: %s", path, query)
+            
+            route = self.exact_routes.get(path)
+            if route is not None:
+                getattr(self, route)(path, query)
                 return
+            
+            if path.startswith('/api/'):
+                for pattern, route in self.api_routes:
+                    match = pattern.match(path)
+                    if match:
+                        getattr(self, route)(path, query, *match.groups())
+                        return
+            
+            # For other static files
+            self.serve_static(path)
 
-            # Route for the main page
-            if path == '/' or path == '/index.html':
-                logging.getLogger().info("Serving main page")
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html')
-                self.end_headers()
-                
-                # Check if token exists
-                token_path = Path(project_root / 'config' / 'token.json')
-                self.config['token_exists'] = token_path.exists()
-                logging.getLogger().debug(f"Token exists: {self.config['token_exists']}")
-                
-                # Render the template
-                try:
-                    template = template_env.get_template('index.html')
-                    html = template.render(
-                        config=self.config,
-                        plugins=self.plugins
-                    )
-                    self.wfile.write(html.encode('utf-8'))
-                    logging.getLogger().info("Main page rendered successfully")
-                except Exception as e:
-                    logging.getLogger().error(f"Error rendering template: {e}")
-                    logging.getLogger().debug(f"Template error traceback: {traceback.format_exc()}")
-                    self.wfile.write(f"Error: {str(e)}".encode('utf-8'))
+        except Exception as e:
+            logger.error("Error handling GET request: %s", e)
+            logger.debug("Request handling error traceback", exc_info=True)
+            self.send_text(500, ERROR_INTERNAL_PREFIX + str(e).encode('utf-8'))
+    
+    def serve_authorize(self, path, query):
+        """Start the OAuth flow, or finish it when Google redirects back with a code"""
+        if 'code' not in query:
+            logger.info("Handling OAuth authorization request")
+            self.handle_authorize()
+        else:
+            logger.info("Handling OAuth callback")
+            self.handle_oauth2callback()
+    
+    def serve_index(self, path, query):
+        """Serve the main page"""
+        # Server-wide state; the OAuth callback swaps in freshly loaded plugins
+        config = self.server.config
+        plugins = self.server.plugins
+        logger.info("Serving main page")
+        
+        # Check if token exists; kept out of the shared config, which other requests read concurrently
+        token_exists = token_file_exists()
+        logger.debug("Token exists: %s", token_exists)
+        
+        # Render the template
+        try:
+            ensure_plugins_loaded(plugins, config)
+            body, gzip_body = render_index_page(config, plugins, token_exists)
+        except Exception as e:
+            logger.error("Error rendering template: %s", e)
+            logger.debug("Template error traceback", exc_info=True)
+            self.send_text(500, ERROR_RENDER_PREFIX + str(e).encode('utf-8'), 'text/html')
+            return
+        
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = gzip_body
+        self.send_response(200)
+        self.send_header('Content-type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+        logger.info("Main page rendered successfully")
+    
+    def serve_cache_invalidate(self, path, query, plugin_name):
+        """Drop the cached API responses of one plugin; only allowed from the kiosk itself"""
+        if not ipaddress.ip_address(self.client_address[0]).is_loopback:
+            logger.warning("Refused cache invalidation from %s", self.client_address[0])
+            self.send_json(403, {
+                'error': "Cache invalidation is only allowed from localhost"
+            })
+            return
+        with _api_cache_lock:
+            stale_keys = [key for key in _api_cache if key[0] == plugin_name]
+            for key in stale_keys:
+                del _api_cache[key]
+        logger.info("Invalidated %s cached responses for plugin: %s", len(stale_keys), plugin_name)
+        self.send_json(200, {'invalidated': len(stale_keys)})
+    
+    def serve_plugin_api(self, path, query, plugin_name, endpoint):
+        """Call a plugin's api_<endpoint> handler and send its result as JSON"""
+        config = self.server.config
+        plugins = self.server.plugins
+        endpoint = endpoint or 'data'
+        
+        logger.info("Handling API request for plugin: %s, endpoint: %s", plugin_name, endpoint)
+        
+        # Look for the plugin module
+        try:
+            if plugin_name in plugins:
+                ensure_plugin_loaded(plugins[plugin_name], config)
+            plugin_path = get_plugin_path(plugin_name)
+            main_py = plugin_path / 'main.py'
+            
+            # Import the plugin module, picking up edits to main.py
+            if load_plugin_module(plugin_name, main_py) is not None:
+                logger.debug("Found plugin module at: %s", main_py)
                 
-                return
-
-            # Route for API endpoints
-            if path.startswith('/api/'):
-                parts = path.strip('/').split('/')
-                if len(parts) >= 3 and parts[0] == 'api' and parts[1] == 'plugins':
-                    plugin_name = parts[2]
-                    endpoint = parts[3] if len(parts) > 3 else 'data'
+                # Look up the API handler in the plugin's dispatch table
+                api_handler = _plugin_handlers.get(plugin_name, {}).get(endpoint)
+                if api_handler is not None:
+                    handler, takes_query = api_handler
+                    logger.debug("Found handler: api_%s", endpoint)
+                    
+                    plugin_config = plugins[plugin_name]['config'] if plugin_name in plugins else {}
                     
-                    logging.getLogger().info(f"Handling API request for plugin: {plugin_name}, endpoint: {endpoint}")
+                    # Responses of parameterless handlers may be reused for cacheTTL seconds
+                    cache_ttl = 0 if takes_query else plugin_config.get('cacheTTL', 0)
                     
-                    # Look for the plugin module
-                    try:
-                        plugin_path = get_plugin_path(plugin_name)
-                        main_py = plugin_path / 'main.py'
-                        
-                        if main_py.exists():
-                            logging.getLogger().debug(f"Found plugin module at: {main_py}")
-                            # Import the plugin module
-                            spec = importlib.util.spec_from_file_location(f"plugin_{plugin_name}", main_py)
-                            plugin_module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(plugin_module)
-                            
-                            # Find the API handler function
-                            handler_name = f"api_{endpoint}"
-                            if hasattr(plugin_module, handler_name):
-                                logging.getLogger().debug(f"Found handler: {handler_name}")
-                                handler = getattr(plugin_module, handler_name)
-                                # Pass query parameters to handler if it expects them
-                                try:
-                                    sig = inspect.signature(handler)
-                                    if len(sig.parameters) == 0:
-                                        result = handler()
-                                    else:
-                                        result = handler(query)
-                                except (ValueError, TypeError):
-                                    # Fallback in case signature cannot be inspected
-                                    result = handler()
-                                
-                                self.send_response(200)
-                                self.send_header('Content-type', 'application/json')
-                                self.end_headers()
-                                self.wfile.write(json.dumps(result).encode('utf-8'))
-                                logging.getLogger().info(f"Successfully handled API request for {plugin_name}/{endpoint}")
+                    # Cached entries hold the encoded body and ETag so hits skip JSON encoding
+                    cache_key = (plugin_name, endpoint)
+                    with _api_cache_lock:
+                        cached = _api_cache.get(cache_key)
+                    if cached and time.monotonic() - cached[0] < cache_ttl:
+                        logger.debug("Serving cached response for %s/%s", plugin_name, endpoint)
+                        _, body, etag = cached
+                    else:
+                        args = (query,) if takes_query else ()
+                        api_timeout = plugin_config.get('apiTimeout')
+                        if api_timeout:
+                            # Bound how long a slow handler can hold the request; it keeps running in the API pool
+                            try:
+                                query_key = tuple(sorted((key, tuple(values)) for key, values in query.items())) if takes_query else ()
+                                future = submit_api_call((handler, plugin_name, endpoint, query_key), call_api_handler, handler, args)
+                                result = future.result(timeout=api_timeout)
+                            except FutureTimeoutError:
+                                logger.warning("Plugin API endpoint timed out after %ss: %s", api_timeout, path)
+                                self.send_json(504, {
+                                    'error': f"Plugin API endpoint timed out: {path}"
+                                })
                                 return
-                        
-                        # If we get here, the handler wasn't found
-                        logging.getLogger().warning(f"Plugin API endpoint not found: {path}")
-                        self.send_response(404)
-                        self.send_header('Content-type', 'application/json')
-                        self.end_headers()
-                        self.wfile.write(json.dumps({
-                            'error': f"Plugin API endpoint not found: {path}"
-                        }).encode('utf-8'))
-                        return
+                        else:
+                            result = handler(*args)
+                        if inspect.isgenerator(result):
+                            self.send_json_stream(result)
+                            logger.info("Streamed API response for %s/%s", plugin_name, endpoint)
+                            return
+                        body = json_bytes(result)
+                        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+                        if cache_ttl:
+                            with _api_cache_lock:
+                                _api_cache[cache_key] = (time.monotonic(), body, etag)
                     
-                    except Exception as e:
-                        logging.getLogger().error(f"Error handling plugin API request: {e}")
-                        logging.getLogger().debug(f"API error traceback: {traceback.format_exc()}")
-                        self.send_response(500)
-                        self.send_header('Content-type', 'application/json')
+                    # Let polling clients revalidate with If-None-Match instead of re-downloading
+                    if_none_match = self.headers.get('If-None-Match')
+                    if if_none_match is not None and etag_matches(if_none_match, etag):
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
                         self.end_headers()
-                        self.wfile.write(json.dumps({
-                            'error': str(e)
-                        }).encode('utf-8'))
+                        logger.debug("API response unchanged for %s/%s", plugin_name, endpoint)
                         return
-
-            # For other static files
-            try:
-                # Map URL path to file system path
-                file_path = self.map_path_to_file(path)
-                logging.getLogger().debug(f"Mapping path {path} to file: {file_path}")
-                
-                if not file_path.exists() or not file_path.is_file():
-                    logging.getLogger().warning(f"File not found: {path}")
-                    self.send_response(404)
-                    self.send_header('Content-type', 'text/plain')
+                    
+                    self.send_response(200)
+                    self.send_header('Content-type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.send_header('ETag', etag)
+                    self.send_header('Cache-Control', 'no-cache')
                     self.end_headers()
-                    self.wfile.write(b'File not found')
+                    self.wfile.write(body)
+                    logger.info("Successfully handled API request for %s/%s", plugin_name, endpoint)
                     return
-                
-                # Get the file's MIME type
-                mimetype, _ = mimetypes.guess_type(str(file_path))
-                if mimetype is None:
-                    mimetype = 'application/octet-stream'
-                logging.getLogger().debug(f"Serving file {file_path} with MIME type: {mimetype}")
-                
-                # Send the file
-                self.send_response(200)
-                self.send_header('Content-type', mimetype)
-                self.end_headers()
-                
-                with open(file_path, 'rb') as f:
-                    self.wfile.write(f.read())
-                logging.getLogger().info(f"Successfully served file: {path}")
-                    
-            except Exception as e:
-                logging.getLogger().error(f"Error serving file: {e}")
-                logging.getLogger().debug(f"File serving error traceback: {traceback.format_exc()}")
-                self.send_response(500)
-                self.send_header('Content-type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(f"Internal server error: {str(e)}".encode('utf-8'))
-
+            
+            # If we get here, the handler wasn't found
+            logger.warning("Plugin API endpoint not found: %s", path)
+            self.send_json(404, {
+                'error': f"Plugin API endpoint not found: {path}"
+            })
+        
         except Exception as e:
-            logging.getLogger().error(f"Error handling GET request: {e}")
-            logging.getLogger().debug(f"Request handling error traceback: {traceback.format_exc()}")
-            self.send_response(500)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(f"Internal server error: {str(e)}".encode('utf-8'))
+            logger.error("Error handling plugin API request: %s", e)
+            logger.debug("API error traceback", exc_info=True)
+            self.send_json(500, {
+                'error': str(e)
+            })
     
-    def map_path_to_file(self, path):
-        """Map URL path to file system path"""
-        # Clean up the path
-        path = path.lstrip('/')
+    def serve_api_batch(self, path, query):
+        """Call one endpoint of several plugins side by side and send the results as one JSON object"""
+        config = self.server.config
+        plugins = self.server.plugins
+        plugin_names = [name for name in query.get('plugins', [''])[0].split(',') if name]
+        endpoint = query.get('endpoint', ['data'])[0]
+        if not plugin_names:
+            self.send_json(400, {
+                'error': "Missing plugins parameter, e.g. /api/batch?plugins=date-time,sensors"
+            })
+            return
         
-        # Check if this is a plugin resource
-        if path.startswith('plugins/'):
-            parts = path.split('/')
-            if len(parts) >= 3:
-                plugin_name = parts[1]
-                resource = '/'.join(parts[2:])
-                plugin_path = get_plugin_path(plugin_name)
-                logging.getLogger().debug(f"Mapping plugin resource: {path} -> {plugin_path / resource}")
-                return plugin_path / resource
+        logger.info("Handling batch API request for plugins: %s, endpoint: %s", plugin_names, endpoint)
+        futures = [(plugin_name, submit_api_call((get_plugin_api_body, plugin_name, endpoint, ()),
+                                                 get_plugin_api_body, plugin_name, endpoint, config, plugins))
+                   for plugin_name in dict.fromkeys(plugin_names)]
         
-        # For static files (including favicon)
-        if path.startswith('static/'):
-            file_path = Path(self.root_dir) / 'backend' / path
-            logging.getLogger().debug(f"Mapping static file: {path} -> {file_path}")
-            return file_path
+        # Results are already encoded (and possibly cached), so the object is assembled from bytes
+        parts = []
+        # Timeouts count from one start, so calls queued behind a full pool don't add up the wait
+        started = time.monotonic()
+        for plugin_name, future in futures:
+            api_timeout = plugins[plugin_name]['config'].get('apiTimeout') if plugin_name in plugins else None
+            api_timeout = api_timeout or DEFAULT_BATCH_TIMEOUT
+            try:
+                body = future.result(timeout=max(0, started + api_timeout - time.monotonic()))
+            except FutureTimeoutError:
+                logger.warning("Plugin API endpoint timed out after %ss: %s/%s", api_timeout, plugin_name, endpoint)
+                body = json_bytes({'error': f"Plugin API endpoint timed out: {plugin_name}/{endpoint}"})
+            except Exception as e:
+                logger.error("Error handling batch API request for %s: %s", plugin_name, e)
+                body = json_bytes({'error': str(e)})
+            parts.append(json_bytes(plugin_name) + b':' + body)
+        body = b'{' + b','.join(parts) + b'}'
         
-        # For everything else, map to the templates directory
-        file_path = Path(self.root_dir) / 'backend' / 'templates' / path
-        logging.getLogger().debug(f"Mapping template file: {path} -> {file_path}")
-        return file_path
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+        logger.info("Successfully handled batch API request for %s plugins", len(futures))
+    
+    def serve_static(self, path):
+        """Serve a file from the templates, static or plugin directories"""
+        try:
+            # Map URL path to file system path
+            file_path, mimetype = resolve_static_path(path)
+            logger.debug("Mapping path %s to file: %s", path, file_path)
+            
+            entry = get_recent_static_entry(file_path)
+            if entry is None:
+                try:
+                    file_stat = file_path.stat()
+                except OSError:
+                    file_stat = None
+                if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+                    logger.warning("File not found: %s", path)
+                    self.send_text(404, ERROR_FILE_NOT_FOUND)
+                    return
+                entry = get_static_entry(file_path, file_stat, mimetype)
+            
+            # Send the file gzipped when the client accepts it and it is worth compressing
+            use_gzip = entry.gzip_body is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+            etag = entry.gzip_etag if use_gzip else entry.etag
+            
+            if self.is_not_modified(entry, etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', STATIC_CACHE_CONTROL)
+                self.end_headers()
+                logger.debug("File unchanged: %s", path)
+                return
+            logger.debug("Serving file %s with MIME type: %s", file_path, entry.mimetype)
+            
+            if entry.body is None:
+                self.send_response(200)
+                self.send_header('Content-type', entry.mimetype)
+                self.send_header('Content-Length', str(entry.size))
+                self.send_header('ETag', entry.etag)
+                self.send_header('Last-Modified', entry.last_modified)
+                self.send_header('Cache-Control', STATIC_CACHE_CONTROL)
+                self.end_headers()
+                self.send_file(file_path, entry.size)
+                logger.info("Successfully served file: %s", path)
+                return
+            
+            body = entry.gzip_body if use_gzip else entry.body
+            self.send_response(200)
+            self.send_header('Content-type', entry.mimetype)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', entry.last_modified)
+            self.send_header('Cache-Control', STATIC_CACHE_CONTROL)
+            if entry.gzip_body is not None:
+                self.send_header('Vary', 'Accept-Encoding')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(body)
+            logger.info("Successfully served file: %s", path)
+                
+        except Exception as e:
+            logger.error("Error serving file: %s", e)
+            logger.debug("File serving error traceback", exc_info=True)
+            self.send_text(500, ERROR_INTERNAL_PREFIX + str(e).encode('utf-8'))
+    
+    def is_not_modified(self, entry, etag):
+        """Check the request's conditional headers against the ETag being served and the file's mtime"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(entry.mtime) <= since
+    
+    def send_json(self, status, obj):
+        """Send a JSON response with a Content-Length header"""
+        body = json_bytes(obj)
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_text(self, status, body, content_type='text/plain'):
+        """Send an already encoded text body with a Content-Length header"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_json_stream(self, items):
+        """Write a generator handler's items as a JSON array while they are produced"""
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Cache-Control', 'no-cache')
+        # No Content-Length: closing the connection marks the end of the array
+        self.send_header('Connection', 'close')
+        self.close_connection = True
+        self.end_headers()
+        separator = b'['
+        try:
+            for item in items:
+                self.wfile.write(separator)
+                self.wfile.write(json_bytes(item))
+                self.wfile.flush()
+                separator = b','
+        except Exception as e:
+            # Headers are already sent, so the client sees a truncated array
+            logger.error("Error streaming API response: %s", e)
+            return
+        self.wfile.write(b'[]' if separator == b'[' else b']')
+    
+    def send_file(self, file_path, size):
+        """Copy a file to the client with sendfile, falling back to buffered writes"""
+        self.wfile.flush()
+        with open(file_path, 'rb') as f:
+            if hasattr(os, 'sendfile'):
+                # socket.sendfile waits out a full send buffer within the socket timeout
+                self.connection.sendfile(f, 0, size)
+            else:
+                # socket.sendfile's own fallback copies in 8 KiB blocks
+                shutil.copyfileobj(f, self.wfile, STREAM_CHUNK_SIZE)
     
     def handle_authorize(self):
         """Handle /authorize route for Google OAuth."""
-        client_secret_path = Path(project_root / 'config' / 'client_secret.json')
-        if not client_secret_path.exists():
+        if not CLIENT_SECRET_PATH.exists():
             self.send_error(500, "client_secret.json not found")
             return
 
-        logging.getLogger().info("Starting OAuth flow...")
-        logging.getLogger().debug(f"Client secret path: {client_secret_path}")
-        logging.getLogger().debug(f"Scopes: {SCOPES}")
+        logger.info("Starting OAuth flow...")
+        logger.debug("Client secret path: %s", CLIENT_SECRET_PATH)
+        logger.debug("Scopes: %s", SCOPES)
 
+        import google_auth_oauthlib.flow
         flow = google_auth_oauthlib.flow.Flow.from_client_secrets_file(
-            str(client_secret_path), 
+            str(CLIENT_SECRET_PATH), 
             scopes=SCOPES
         )
         flow.redirect_uri = f'http://localhost:{self.server.server_port}/authorize'
@@ -318,56 +747,55 @@ class KioskHTTPRequestHandler(BaseHTTPRequestHandler):
             include_granted_scopes='false'  # Don't use incremental auth
         )
         
-        logging.getLogger().debug(f"Generated authorization URL: {authorization_url}")
-        logging.getLogger().debug(f"State: {state}")
+        logger.debug("Generated authorization URL: %s", authorization_url)
+        logger.debug("State: %s", state)
         
-        # Store state in a temporary file since we don't have sessions
-        with open(Path(project_root / 'config' / '.oauth_state'), 'w') as f:
-            f.write(state)
+        # Remember the state in memory since we don't have sessions
+        with _oauth_states_lock:
+            _oauth_states[state] = time.monotonic()
 
         self.send_response(302)
         self.send_header('Location', authorization_url)
+        self.send_header('Content-Length', '0')
         self.end_headers()
-        logging.getLogger().info("Redirecting to Google authorization URL")
+        logger.info("Redirecting to Google authorization URL")
 
     def handle_oauth2callback(self):
         """Handle /authorize route for Google OAuth."""
         try:
-            logging.getLogger().info("Received OAuth callback")
-            logging.getLogger().debug(f"Full callback path: {self.path}")
+            logger.info("Received OAuth callback")
+            logger.debug("Full callback path: %s", self.path)
             
             # Parse query parameters from the callback URL
-            parsed_url = urlparse(self.path)
-            query_params = parse_qs(parsed_url.query)
+            query_params = parse_qs(self.path.partition('?')[2])
             
-            logging.getLogger().debug(f"Query parameters: {query_params}")
+            logger.debug("Query parameters: %s", query_params)
             
             # Get state from callback URL
             callback_state = query_params.get('state', [None])[0]
-            logging.getLogger().debug(f"Callback state: {callback_state}")
+            logger.debug("Callback state: %s", callback_state)
             
-            # Get state from temporary file
-            state_path = Path(project_root / 'config' / '.oauth_state')
-            if not state_path.exists():
-                logging.getLogger().error("No state file found")
-                self.send_error(400, "No state found")
-                return
-
-            with open(state_path, 'r') as f:
-                stored_state = f.read().strip()
-            logging.getLogger().debug(f"Stored state: {stored_state}")
+            # Look up and consume the state issued by handle_authorize, dropping expired ones
+            now = time.monotonic()
+            with _oauth_states_lock:
+                for expired in [key for key, issued in _oauth_states.items() if now - issued > OAUTH_STATE_TTL]:
+                    del _oauth_states[expired]
+                if not _oauth_states:
+                    logger.error("No pending OAuth state found")
+                    self.send_error(400, "No state found")
+                    return
+                stored_state = callback_state if callback_state in _oauth_states else None
+                _oauth_states.pop(callback_state, None)
             
             # Compare states
-            if callback_state != stored_state:
-                logging.getLogger().error(f"State mismatch! Callback: {callback_state}, Stored: {stored_state}")
+            if stored_state is None:
+                logger.error("State mismatch! Callback: %s is not a pending state", callback_state)
                 self.send_error(400, "State mismatch - possible CSRF attack")
                 return
-            
-            state_path.unlink()  # Clean up
 
-            client_secret_path = Path(project_root / 'config' / 'client_secret.json')
+            import google_auth_oauthlib.flow
             flow = google_auth_oauthlib.flow.Flow.from_client_secrets_file(
-                str(client_secret_path),
+                str(CLIENT_SECRET_PATH),
                 scopes=SCOPES,
                 state=stored_state
             )
@@ -375,40 +803,40 @@ class KioskHTTPRequestHandler(BaseHTTPRequestHandler):
             
             # Get authorization response URL
             authorization_response = f'http://localhost:{self.server.server_port}{self.path}'
-            logging.getLogger().debug(f"Authorization response: {authorization_response}")
+            logger.debug("Authorization response: %s", authorization_response)
             
             flow.fetch_token(authorization_response=authorization_response)
-            logging.getLogger().info("Successfully fetched token")
+            logger.info("Successfully fetched token")
             
             credentials = flow.credentials
             if not credentials.refresh_token:
-                logging.getLogger().error("No refresh token received")
+                logger.error("No refresh token received")
                 self.send_error(400, "No refresh token received")
                 return
 
             # Save credentials
-            token_path = Path(project_root / 'config' / 'token.json')
-            token_path.parent.mkdir(exist_ok=True)
+            TOKEN_PATH.parent.mkdir(exist_ok=True)
             token_data = credentials_to_dict(credentials)
-            logging.getLogger().debug(f"Token data to save: {json.dumps(token_data, indent=2)}")
-            with open(token_path, 'w') as f:
-                json.dump(token_data, f)
-            logging.getLogger().info("Credentials saved to token.json")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Token data to save: %s", json.dumps(token_data, indent=2))
+            TOKEN_PATH.write_text(json.dumps(token_data))
+            logger.info("Credentials saved to token.json")
+            _token_state['checked_at'] = None
 
             # --- RELOAD PLUGINS HERE ---
-            self.server.plugins = load_plugins(self.config)
-            logging.getLogger().info("Plugins reloaded after OAuth2 callback")
+            self.server.plugins = load_plugins(self.server.config)
+            logger.info("Plugins reloaded after OAuth2 callback")
             # --- END RELOAD ---
 
             # Redirect to success page
             self.send_response(302)
             self.send_header('Location', '/')
+            self.send_header('Content-Length', '0')
             self.end_headers()
-            logging.getLogger().info("Redirecting back to home page")
+            logger.info("Redirecting back to home page")
 
         except Exception as e:
-            logging.getLogger().error(f"OAuth callback error: {e}")
-            logging.getLogger().error(f"Error traceback: {traceback.format_exc()}")
+            logger.error("OAuth callback error: %s", e, exc_info=True)
             self.send_error(500, str(e))
 
 
@@ -417,56 +845,52 @@ def load_plugins(config):
     plugins = {}
     enabled_plugins = config.get('enabledPlugins', [])
     
-    # Get system-wide log level
-    system_log_level = config.get('system', {}).get('logging', 'INFO').upper()
-    if system_log_level == 'OFF':
-        system_log_level = logging.CRITICAL + 1  # Effectively disables logging
-    else:
-        system_log_level = getattr(logging, system_log_level, logging.INFO)
-    
     # Get orientation from system config for position selection
-    orientation = config.get('system', {}).get('orientation', 'landscape')
-    if system_log_level <= logging.CRITICAL:
-        logging.getLogger().info(f"System orientation: {orientation}")
-        logging.getLogger().info(f"Enabled plugins: {enabled_plugins}")
+    orientation = get_system_config(config).orientation
+    logger.info("System orientation: %s", orientation)
+    logger.info("Enabled plugins: %s", enabled_plugins)
     
     # Loop through all enabled plugins
-    for plugin_name in enabled_plugins:
-        if system_log_level <= logging.CRITICAL:
-            logging.getLogger().info(f"Configuring: {plugin_name}")
+    for plugin_index, plugin_name in enumerate(enabled_plugins):
+        logger.info("Configuring: %s", plugin_name)
         plugin_path = get_plugin_path(plugin_name)
         
-        if not plugin_path.exists():
-            if system_log_level <= logging.CRITICAL:
-                logging.getLogger().error(f"Plugin directory not found: {plugin_path}")
+        # One directory read tells us which of the plugin's files exist
+        try:
+            with os.scandir(plugin_path) as it:
+                plugin_entries = {entry.name for entry in it}
+        except (FileNotFoundError, NotADirectoryError):
+            logger.error("Plugin directory not found: %s", plugin_path)
             continue
+        static_entries = set()
+        if 'static' in plugin_entries:
+            try:
+                with os.scandir(plugin_path / 'static') as it:
+                    static_entries = {entry.name for entry in it}
+            except (FileNotFoundError, NotADirectoryError):
+                pass
         
         # Load plugin's own config file
         plugin_config_path = plugin_path / 'config.json'
         plugin_config = {}
         
-        if plugin_config_path.exists():
+        if 'config.json' in plugin_entries:
             try:
-                with open(plugin_config_path, 'r') as f:
-                    plugin_config = json.load(f)
-                    # Report logging level
-                    log_level = plugin_config.get('logging', 'INFO')
-                    if system_log_level <= logging.CRITICAL:
-                        logging.getLogger().info(f"{plugin_name} - Logging level: {log_level}")
+                plugin_config = load_plugin_config(plugin_config_path)
+                # Report logging level
+                log_level = plugin_config.get('logging', 'INFO')
+                logger.info("%s - Logging level: %s", plugin_name, log_level)
             except Exception as e:
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().error(f"Error loading plugin config: {e}")
+                logger.error("Error loading plugin config: %s", e)
         
         # Ensure plugin has its own data directory
         plugin_data_dir = plugin_path / 'data'
-        if not plugin_data_dir.exists():
+        if 'data' not in plugin_entries:
             try:
                 plugin_data_dir.mkdir(exist_ok=True)
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().debug(f"Created data directory for plugin: {plugin_data_dir}")
+                logger.debug("Created data directory for plugin: %s", plugin_data_dir)
             except Exception as e:
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().error(f"Failed to create data directory for plugin {plugin_name}: {e}")
+                logger.error("Failed to create data directory for plugin %s: %s", plugin_name, e)
         
         # Get the position configuration based on orientation
         position = {}
@@ -474,19 +898,15 @@ def load_plugins(config):
             # If plugin has orientation-specific positions
             if orientation in plugin_config['position']:
                 position = plugin_config['position'][orientation]
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().info(f"{plugin_name} - Position: {position}")
+                logger.info("%s - Position: %s", plugin_name, position)
             # If it has a general position setting
             elif isinstance(plugin_config['position'], dict) and not ('landscape' in plugin_config['position'] or 'portrait' in plugin_config['position']):
                 position = plugin_config['position']
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().info(f"{plugin_name} - Position: {position}")
+                logger.info("%s - Position: %s", plugin_name, position)
             else:
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().warning(f"Position config for {plugin_name} does not match expected format: {plugin_config['position']}")
+                logger.warning("Position config for %s does not match expected format: %s", plugin_name, plugin_config['position'])
         else:
-            if system_log_level <= logging.CRITICAL:
-                logging.getLogger().warning(f"No position key found in config for plugin {plugin_name}")
+            logger.warning("No position key found in config for plugin %s", plugin_name)
         
         # Default fallback if no position found
         if not position:
@@ -496,29 +916,12 @@ def load_plugins(config):
                 'width': '100%',
                 'height': '100%'
             }
-            if system_log_level <= logging.CRITICAL:
-                logging.getLogger().warning(f"No position config found for plugin {plugin_name}, using defaults: {position}")
+            logger.warning("No position config found for plugin %s, using defaults: %s", plugin_name, position)
         
         # Set z_index based on plugin's position in the enabledPlugins array (starting from 1)
-        position['z_index'] = enabled_plugins.index(plugin_name) + 1
-        if system_log_level <= logging.CRITICAL:
-            logging.getLogger().info(f"{plugin_name} - z_index: {position['z_index']}")
+        position['z_index'] = plugin_index + 1
+        logger.info("%s - z_index: %s", plugin_name, position['z_index'])
         
-        # Try to call init(config) if it exists
-        plugin_data = {}
-        main_py = plugin_path / 'main.py'
-        if main_py.exists():
-            try:
-                import importlib.util
-                spec = importlib.util.spec_from_file_location(f"plugin_{plugin_name}", main_py)
-                plugin_module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(plugin_module)
-                if hasattr(plugin_module, 'init'):
-                    plugin_data = plugin_module.init(plugin_config).get('data', {})
-            except Exception as e:
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().error(f"Error calling init() for plugin {plugin_name}: {e}")
-
         plugin_info = {
             'name': plugin_name,
             'position': position,
@@ -528,41 +931,275 @@ def load_plugins(config):
             'view_content': None,
             'data_dir': str(plugin_data_dir),
             'config': plugin_config,
-            'data': plugin_data
+            'data': {},
+            'loaded': False
         }
         
         # Check for basic files
-        view_path = plugin_path / 'view.html'
-        script_path = plugin_path / 'static' / 'script.js'
-        style_path = plugin_path / 'static' / 'style.css'
-        
-        if view_path.exists():
+        if 'view.html' in plugin_entries:
             plugin_info['view'] = 'view.html'
-            try:
-                with open(view_path, 'r') as f:
-                    view_template = template_env.from_string(f.read())
-                    plugin_info['view_content'] = view_template.render(
-                        config=config,
-                        plugin=plugin_info
-                    )
-            except Exception as e:
-                if system_log_level <= logging.CRITICAL:
-                    logging.getLogger().error(f"Error reading or rendering plugin view for '{plugin_name}': {e}")
-                plugin_info['view_content'] = f"<div style='color:red;'>Error rendering {plugin_name} view: {e}</div>"
         
-        if script_path.exists():
+        if 'script.js' in static_entries:
             plugin_info['script'] = 'static/script.js'
         
-        if style_path.exists():
+        if 'style.css' in static_entries:
             plugin_info['style'] = 'static/style.css'
         
         plugins[plugin_name] = plugin_info
-        if system_log_level <= logging.CRITICAL:
-            logging.getLogger().info(f"{plugin_name} - Loaded successfully")
+        logger.info("%s - Loaded successfully", plugin_name)
+    
+    # init() and view rendering run in the background unless eager loading is requested;
+    # a request that needs a plugin before it is ready waits for it in ensure_plugin_loaded()
+    if EAGER_PLUGINS:
+        ensure_plugins_loaded(plugins, config)
+    else:
+        for plugin_info in plugins.values():
+            submit_plugin_load(plugin_info, config)
     
     return plugins
 
 
+def load_plugin_config(plugin_config_path):
+    """Parse a plugin's config.json, reusing the previous result while the file is unchanged"""
+    mtime = os.stat(plugin_config_path).st_mtime_ns
+    cached = _plugin_configs.get(plugin_config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(plugin_config_path, 'rb') as f:
+        raw = f.read()
+    plugin_config = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _plugin_configs[plugin_config_path] = (mtime, plugin_config)
+    return plugin_config
+
+
+def load_plugin_module(plugin_name, main_py):
+    """Import a plugin's main.py, reusing the module until the file changes; None if it is missing"""
+    global _index_page
+    try:
+        mtime = os.stat(main_py).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _plugin_modules.get(plugin_name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    with _plugin_module_locks.setdefault(plugin_name, threading.Lock()):
+        cached = _plugin_modules.get(plugin_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        module_name = f"plugin_{plugin_name}"
+        spec = importlib.util.spec_from_file_location(module_name, main_py)
+        plugin_module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = plugin_module
+        reinit = _plugin_inits.get(plugin_name) if cached is not None else None
+        init_result = None
+        try:
+            spec.loader.exec_module(plugin_module)
+            # A reloaded module starts with fresh globals, so it gets the same init() as the old one
+            # before any request can reach its handlers
+            init = getattr(plugin_module, 'init', None)
+            if reinit is not None and callable(init):
+                init_result = init(reinit[0]['config'])
+        except Exception as e:
+            if cached is None:
+                del sys.modules[module_name]
+                raise
+            # Keep serving the previous version until the file is edited again
+            logger.error("Error reloading plugin module %s, keeping the previous one: %s", plugin_name, e)
+            sys.modules[module_name] = cached[1]
+            _plugin_modules[plugin_name] = (mtime, cached[1])
+            return cached[1]
+        _plugin_handlers[plugin_name] = resolve_api_handlers(plugin_module)
+        _plugin_modules[plugin_name] = (mtime, plugin_module)
+        
+        if cached is not None:
+            logger.info("Reloaded plugin module after change: %s", plugin_name)
+            with _api_cache_lock:
+                for key in [key for key in _api_cache if key[0] == plugin_name]:
+                    del _api_cache[key]
+            if init_result is not None:
+                plugin_info, config = reinit
+                plugin_info['data'] = init_result.get('data', {})
+                render_plugin_view(plugin_info, config)
+                _index_page = None
+        return plugin_module
+
+
+def render_index_page(config, plugins, token_exists):
+    """Return the main page and its gzip body, rendering only when plugins or token state changed"""
+    global _index_page
+    cached = _index_page
+    if cached is not None and cached[0] is plugins and cached[1] == token_exists:
+        return cached[2], cached[3]
+    
+    page_config = dict(config, token_exists=token_exists)
+    body = INDEX_TEMPLATE.render(config=page_config, plugins=plugins).encode('utf-8')
+    gzip_body = gzip.compress(body, compresslevel=6)
+    # Plugins still initializing are missing from the page, so only keep it once all are in
+    if all(plugin_info['loaded'] for plugin_info in plugins.values()):
+        _index_page = (plugins, token_exists, body, gzip_body)
+        logger.debug("Cached rendered main page")
+    return body, gzip_body
+
+
+def reload_plugins(httpd):
+    """Re-read main.json and plugin configs and swap them into the running server"""
+    global _index_page
+    logger.info("Reloading config and plugins")
+    config = load_config()
+    logging.getLogger().setLevel(get_system_log_level(config))
+    httpd.config = config
+    httpd.system = get_system_config(config)
+    httpd.plugins = load_plugins(config)
+    _index_page = None
+    with _api_cache_lock:
+        _api_cache.clear()
+
+
+def get_plugin_api_body(plugin_name, endpoint, config, plugins):
+    """Call a plugin's api_<endpoint> handler without parameters and return the encoded JSON result"""
+    if plugin_name not in plugins:
+        raise LookupError(f"Plugin not enabled: {plugin_name}")
+    plugin_info = plugins[plugin_name]
+    ensure_plugin_loaded(plugin_info, config)
+    load_plugin_module(plugin_name, get_plugin_path(plugin_name) / 'main.py')
+    api_handler = _plugin_handlers.get(plugin_name, {}).get(endpoint)
+    if api_handler is None:
+        raise LookupError(f"Plugin API endpoint not found: {plugin_name}/{endpoint}")
+    handler, takes_query = api_handler
+    
+    # Shares cacheTTL entries with /api/plugins/<name>/<endpoint>
+    cache_ttl = 0 if takes_query else plugin_info['config'].get('cacheTTL', 0)
+    cache_key = (plugin_name, endpoint)
+    with _api_cache_lock:
+        cached = _api_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < cache_ttl:
+        return cached[1]
+    
+    body = json_bytes(call_api_handler(handler, ({},) if takes_query else ()))
+    if cache_ttl:
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        with _api_cache_lock:
+            _api_cache[cache_key] = (time.monotonic(), body, etag)
+    return body
+
+
+def submit_api_call(key, fn, *args):
+    """Run fn(*args) in the API pool, or return the future of a call with the same key that is still running"""
+    with _api_calls_lock:
+        future = _api_calls.get(key)
+        if future is not None:
+            return future
+        future = _api_pool.submit(fn, *args)
+        _api_calls[key] = future
+    
+    def forget(done):
+        with _api_calls_lock:
+            if _api_calls.get(key) is done:
+                del _api_calls[key]
+    future.add_done_callback(forget)
+    return future
+
+
+def call_api_handler(handler, args):
+    """Call an api_* handler in the API pool, collecting a generator's items so its timeout covers all of them"""
+    result = handler(*args)
+    if inspect.isgenerator(result):
+        result = list(result)
+    return result
+
+
+def resolve_api_handlers(plugin_module):
+    """Build the endpoint dispatch table from a plugin module's api_* functions"""
+    handlers = {}
+    for attr_name, handler in vars(plugin_module).items():
+        if not attr_name.startswith('api_') or not callable(handler):
+            continue
+        # Pass query parameters only to handlers that accept them
+        try:
+            takes_query = len(inspect.signature(handler).parameters) > 0
+        except (ValueError, TypeError):
+            # Fallback in case signature cannot be inspected
+            takes_query = False
+        handlers[attr_name[len('api_'):]] = (handler, takes_query)
+    return handlers
+
+
+def ensure_plugin_loaded(plugin_info, config):
+    """Import the plugin's main.py, call init(config) and render its view on first use"""
+    if plugin_info['loaded']:
+        return
+    
+    with _plugin_load_locks.setdefault(plugin_info['name'], threading.Lock()):
+        if plugin_info['loaded']:
+            return
+        
+        plugin_name = plugin_info['name']
+        plugin_path = get_plugin_path(plugin_name)
+        logger.debug("Initializing plugin on first use: %s", plugin_name)
+        
+        # Try to call init(config) if it exists
+        main_py = plugin_path / 'main.py'
+        try:
+            # init() runs below, so a reload triggered by this import must not run it as well
+            _plugin_inits.pop(plugin_name, None)
+            plugin_module = load_plugin_module(plugin_name, main_py)
+            init = getattr(plugin_module, 'init', None)
+            if callable(init):
+                plugin_info['data'] = init(plugin_info['config']).get('data', {})
+            _plugin_inits[plugin_name] = (plugin_info, config)
+        except Exception as e:
+            logger.error("Error calling init() for plugin %s: %s", plugin_name, e)
+        
+        render_plugin_view(plugin_info, config)
+        plugin_info['loaded'] = True
+
+
+def render_plugin_view(plugin_info, config):
+    """Render the plugin's view.html into plugin_info['view_content']"""
+    if not plugin_info['view']:
+        return
+    plugin_name = plugin_info['name']
+    try:
+        view_template = template_env.get_template(f"plugins/{plugin_name}/{plugin_info['view']}")
+        plugin_info['view_content'] = view_template.render(
+            config=config,
+            plugin=plugin_info
+        )
+    except Exception as e:
+        logger.error("Error reading or rendering plugin view for '%s': %s", plugin_name, e)
+        plugin_info['view_content'] = f"<div style='color:red;'>Error rendering {plugin_name} view: {e}</div>"
+
+
+def submit_plugin_load(plugin_info, config):
+    """Queue ensure_plugin_loaded() on the plugin pool once per plugin_info and return its future"""
+    with _plugin_init_futures_lock:
+        queued = _plugin_init_futures.get(plugin_info['name'])
+        if queued is not None and queued[0] is plugin_info:
+            return queued[1]
+        future = _plugin_pool.submit(ensure_plugin_loaded, plugin_info, config)
+        _plugin_init_futures[plugin_info['name']] = (plugin_info, future)
+        return future
+
+
+def ensure_plugins_loaded(plugins, config):
+    """Initialize all pending plugins in parallel, waiting until each one's initTimeout has passed"""
+    pending = [(plugin_info, submit_plugin_load(plugin_info, config))
+               for plugin_info in plugins.values() if not plugin_info['loaded']]
+    
+    # Timeouts count from one start, so plugins queued behind a full pool don't add up the wait
+    started = time.monotonic()
+    for plugin_info, future in pending:
+        deadline = started + plugin_info['config'].get('initTimeout', DEFAULT_INIT_TIMEOUT)
+        try:
+            future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            logger.warning("Plugin %s is still initializing, rendering without it", plugin_info['name'])
+        except Exception as e:
+            logger.error("Error initializing plugin %s: %s", plugin_info['name'], e)
+
+
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Fridge Kiosk Application')
@@ -571,51 +1208,99 @@ def parse_args():
     return parser.parse_args()
 
 
+class KioskHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server that handles at most max_workers requests at once"""
+    max_workers = 32
+    # Per-request threads don't keep the process alive, so Ctrl-C exits with connections open
+    daemon_threads = True
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_slots = threading.BoundedSemaphore(self.max_workers)
+    
+    def process_request(self, request, client_address):
+        # Wait for a free slot instead of starting an unbounded number of threads
+        self.request_slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.request_slots.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.request_slots.release()
+
+
+def create_server(config, plugins, port):
+    """Create the kiosk HTTP server without starting it"""
+    # Requests run on worker threads so a slow plugin API call doesn't stall the page or its assets
+    server_address = ('', port)
+    httpd = KioskHTTPServer(server_address, KioskHTTPRequestHandler)
+    # Handlers read app state from the server instead of receiving it per request
+    httpd.config = config
+    httpd.plugins = plugins
+    httpd.system = get_system_config(config)
+    return httpd
+
+
 def main():
     """Main entry point"""
     # Parse command line arguments
     args = parse_args()
     
-    # Load configuration
-    config = load_config()
+    # Load configuration (already read at import)
+    config = main_config
     
     # Configure logging level from config
-    system_log_level = config.get('system', {}).get('logging', 'INFO').upper()
-    if system_log_level == 'OFF':
-        system_log_level = logging.CRITICAL + 1  # system_log_level=51  Effectively disables logging   
-    else:
-        system_log_level = getattr(logging, system_log_level, logging.INFO)
+    system_log_level = get_system_log_level(config)
     
     # Set up logging with the configured level
-    logger = setup_logging(config)
-    logger.setLevel(system_log_level)
+    root_logger = setup_logging(config)
+    root_logger.setLevel(system_log_level)
+    
+    try:
+        TEMPLATE_CACHE_DIR.mkdir(exist_ok=True)
+        cache_writable = os.access(TEMPLATE_CACHE_DIR, os.W_OK)
+    except OSError:
+        cache_writable = False
+    if cache_writable:
+        template_env.bytecode_cache = jinja2.FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR))
+    else:
+        logger.warning("Template cache directory %s is not writable, templates are compiled on every start", TEMPLATE_CACHE_DIR)
+    
+    if precompiled_templates_stale:
+        logger.warning("Templates changed since they were precompiled, loading them from source; "
+                       "run backend/precompile_templates.py to refresh %s", COMPILED_TEMPLATES_DIR)
+    
+    # Compile plugin bytecode in the background so the first import doesn't pay for it
+    threading.Thread(target=compileall.compile_dir, args=(str(PLUGINS_DIR),),
+                     kwargs={'maxlevels': 1, 'quiet': 1}, daemon=True).start()
     
     # Load plugins
     plugins = load_plugins(config)
+    _plugin_pool.submit(warm_static_cache, plugins)
     
-    # Create handler factory with app config
-    def handler(*args, **kwargs):
-        return KioskHTTPRequestHandler(
-            *args,
-            config=config,
-            plugins=plugins,
-            **kwargs
-        )
+    httpd = create_server(config, plugins, args.port)
     
-    # Start HTTP server
-    server_address = ('', args.port)
-    httpd = HTTPServer(server_address, handler)
+    # SIGHUP picks up config and plugin changes without restarting the kiosk
+    def handle_sighup(signum, frame):
+        threading.Thread(target=reload_plugins, args=(httpd,), daemon=True).start()
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, handle_sighup)
     
-    # Only log if logging is not OFF
-    if system_log_level <= logging.CRITICAL:
-        logging.getLogger().info(f"Server started on port {args.port}")
+    # The root logger's level already drops these when logging is OFF
+    logger.info("Server started on port %s", args.port)
     
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        if system_log_level <= logging.CRITICAL:
-            logging.getLogger().info("Server stopped by user")
+        logger.info("Server stopped by user")
         httpd.server_close()
+        # Drain queued log records before exiting
+        stop_logging()
         sys.exit(0)
 
 
@@ -4,14 +4,28 @@ Configuration utilities for the fridge-kiosk system.
 """
 
 import os
+import re
 import json
+import queue
+import atexit
+import functools
 import logging
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from collections import namedtuple
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import sys
 
 logger = logging.getLogger(__name__)
 
+# Important paths
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+CONFIG_DIR = PROJECT_ROOT / 'config'
+PLUGINS_DIR = PROJECT_ROOT / 'plugins'
+LOGS_DIR = PROJECT_ROOT / 'logs'
+
+# Background listener that writes queued log records to the real handlers
+_log_listener = None
+
 class PluginFormatter(logging.Formatter):
     """Custom formatter that adds plugin name and improves readability"""
     def format(self, record):
@@ -39,18 +53,13 @@ def load_config():
     Returns:
         dict: The configuration dictionary, or empty dict if not found.
     """
-    # Get the project root directory (parent of the backend directory)
-    project_root = Path(__file__).resolve().parent.parent.parent
-    
     # Path to the config file
-    config_path = project_root / 'config' / 'main.json'
+    config_path = CONFIG_DIR / 'main.json'
     
     try:
         if config_path.exists():
             logger.info(f"Loading configuration from {config_path}")
-            with config_path.open('r') as f:
-                config = json.load(f)
-            return config
+            return json.loads(config_path.read_bytes())
         else:
             logger.warning(f"Configuration file not found: {config_path}")
             # Return default configuration
@@ -68,6 +77,30 @@ def load_config():
         logger.error(f"Error loading configuration: {e}")
         return {}
 
+# Config keys whose string values must never be sent to the browser
+SENSITIVE_KEY_PATTERN = re.compile(r'secret|key|token|password', re.IGNORECASE)
+
+def sanitize_config(config):
+    """
+    Return a deep copy of a configuration value with sensitive strings masked.
+    
+    Args:
+        config: The configuration value (dict, list or scalar) to sanitize.
+        
+    Returns:
+        A copy where string values under keys matching SENSITIVE_KEY_PATTERN are
+        replaced with '***', at any depth of nested dicts and lists.
+    """
+    if isinstance(config, dict):
+        return {
+            key: '***' if isinstance(value, str) and isinstance(key, str) and SENSITIVE_KEY_PATTERN.search(key)
+            else sanitize_config(value)
+            for key, value in config.items()
+        }
+    if isinstance(config, list):
+        return [sanitize_config(value) for value in config]
+    return config
+
 def get_env(key, default=None):
     """
     Get an environment variable with a default value.
@@ -81,6 +114,7 @@ def get_env(key, default=None):
     """
     return os.environ.get(key, default)
 
+@functools.lru_cache(maxsize=256)
 def get_plugin_path(plugin_name):
     """
     Get the absolute path to a plugin directory.
@@ -91,8 +125,7 @@ def get_plugin_path(plugin_name):
     Returns:
         str: The absolute path to the plugin directory.
     """
-    project_root = Path(__file__).resolve().parent.parent.parent
-    return project_root / 'plugins' / plugin_name
+    return PLUGINS_DIR / plugin_name
 
 def list_plugins():
     """
@@ -101,15 +134,13 @@ def list_plugins():
     Returns:
         list: A list of plugin names.
     """
-    project_root = Path(__file__).resolve().parent.parent.parent
-    plugins_dir = project_root / 'plugins'
-    
-    if not plugins_dir.exists():
-        logger.warning(f"Plugins directory not found: {plugins_dir}")
+    if not PLUGINS_DIR.exists():
+        logger.warning(f"Plugins directory not found: {PLUGINS_DIR}")
         return []
     
-    # Get all directories in the plugins directory
-    return [d.name for d in plugins_dir.iterdir() if d.is_dir() and not d.name.startswith('_')]
+    # Get all directories in the plugins directory (scandir reuses the dirent type, no stat per entry)
+    with os.scandir(PLUGINS_DIR) as entries:
+        return [entry.name for entry in entries if entry.name[0] not in '._' and entry.is_dir()]
 
 def get_plugin_config(plugin_name):
     """
@@ -141,37 +172,79 @@ def get_plugin_log_level(plugin_name, config):
     
     try:
         if plugin_config_path.exists():
-            with open(plugin_config_path, 'r') as f:
-                plugin_config = json.load(f)
-                if 'logging' in plugin_config:
-                    level = plugin_config['logging'].upper()
-                    if level == 'OFF':
-                        return logging.CRITICAL + 1  # Effectively disables logging
-                    return getattr(logging, level, logging.INFO)
+            plugin_config = json.loads(plugin_config_path.read_bytes())
+            if 'logging' in plugin_config:
+                level = plugin_config['logging'].upper()
+                if level == 'OFF':
+                    return logging.CRITICAL + 1  # Effectively disables logging
+                return getattr(logging, level, logging.INFO)
     except Exception as e:
         logger.error(f"Error reading plugin config for {plugin_name}: {e}")
     
     # Fall back to system-wide log level
-    return getattr(logging, config.get('system', {}).get('logging', 'INFO').upper(), logging.INFO)
+    return get_system_log_level(config)
+
+# Flattened view of config['system'], built once instead of chained .get() calls per use
+SystemConfig = namedtuple('SystemConfig', ['name', 'theme', 'orientation', 'logging', 'font_family'])
+
+def get_system_config(config):
+    """
+    Get the system section of the main configuration as a SystemConfig.
+    
+    Args:
+        config (dict): The main configuration dictionary.
+        
+    Returns:
+        SystemConfig: The system settings with defaults filled in.
+    """
+    system = config.get('system', {})
+    return SystemConfig(
+        name=system.get('name', 'Fridge Kiosk'),
+        theme=system.get('theme', 'dark'),
+        orientation=system.get('orientation', 'landscape'),
+        logging=system.get('logging', 'INFO').upper(),
+        font_family=system.get('fontFamily', "'Courier New', monospace")
+    )
+
+def get_system_log_level(config):
+    """
+    Get the system-wide log level from the main configuration.
+    
+    Args:
+        config (dict): The main configuration dictionary.
+        
+    Returns:
+        int: The logging level, above CRITICAL when logging is OFF.
+    """
+    system_log_level = config.get('system', {}).get('logging', 'INFO').upper()
+    if system_log_level == 'OFF':
+        return logging.CRITICAL + 1  # Effectively disables logging
+    return getattr(logging, system_log_level, logging.INFO)
+
+def stop_logging():
+    """Flush queued log records and stop the background log listener"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 def setup_logging(config=None):
     """Set up logging configuration for the entire application"""
+    global _log_listener
+
     # Create logs directory if it doesn't exist
-    logs_dir = Path(__file__).parent.parent.parent / 'logs'
+    logs_dir = LOGS_DIR
     logs_dir.mkdir(exist_ok=True)
 
     # Get system-wide log level from config or default to INFO
-    system_log_level = config.get('system', {}).get('logging', 'INFO').upper()
-    if system_log_level == 'OFF':
-        system_log_level = logging.CRITICAL + 1  # Effectively disables logging
-    else:
-        system_log_level = getattr(logging, system_log_level, logging.INFO)
+    system_log_level = get_system_log_level(config)
 
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(system_log_level)
 
     # Remove existing handlers
+    stop_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
@@ -187,13 +260,20 @@ def setup_logging(config=None):
         encoding='utf-8'
     )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    handlers = [file_handler]
 
     # Add console handler for development
     if os.environ.get('FLASK_ENV') == 'development':
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(console_formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    # Request threads only enqueue records; file and console writes happen on the listener thread
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(stop_logging)
 
     # Set specific loggers to WARNING and remove their handlers
     noisy_loggers = [
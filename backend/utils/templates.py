@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Jinja2 template setup shared by the backend and the template precompiler.
+"""
+
+import os
+import datetime
+import jinja2
+
+from backend.utils.config import sanitize_config, PROJECT_ROOT, PLUGINS_DIR
+
+# Important paths
+TEMPLATES_DIR = PROJECT_ROOT / 'backend' / 'templates'
+# Templates precompiled by backend/precompile_templates.py
+COMPILED_TEMPLATES_DIR = PROJECT_ROOT / '.jinja_compiled'
+
+def is_page_template(name):
+    """Only compile the main page and plugin views, not static assets"""
+    if name.startswith('plugins/'):
+        return name.count('/') == 2 and name.endswith('/view.html')
+    return name.endswith('.html')
+
+def create_source_loader():
+    """Load templates from source; plugin views are addressed as plugins/<name>/view.html"""
+    return jinja2.ChoiceLoader([
+        jinja2.FileSystemLoader(searchpath=str(TEMPLATES_DIR)),
+        jinja2.PrefixLoader({'plugins': jinja2.FileSystemLoader(searchpath=str(PLUGINS_DIR))}),
+    ])
+
+def compiled_templates_current():
+    """Check that precompiled templates exist and no page template was edited after they were built"""
+    try:
+        with os.scandir(COMPILED_TEMPLATES_DIR) as entries:
+            compiled_mtime = min(entry.stat().st_mtime for entry in entries)
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        return False
+
+    sources = []
+    for dirpath, _, filenames in os.walk(TEMPLATES_DIR):
+        sources += [os.path.join(dirpath, filename) for filename in filenames if filename.endswith('.html')]
+    with os.scandir(PLUGINS_DIR) as entries:
+        sources += [os.path.join(entry.path, 'view.html') for entry in entries if entry.is_dir()]
+
+    for source in sources:
+        try:
+            if os.stat(source).st_mtime > compiled_mtime:
+                return False
+        except FileNotFoundError:
+            continue
+    return True
+
+def create_template_env(loader, bytecode_cache=None):
+    """Create the Jinja2 environment with the kiosk's custom filters"""
+    # Templates only change on deploy, so skip the per-render mtime check
+    env = jinja2.Environment(
+        loader=loader,
+        auto_reload=False,
+        bytecode_cache=bytecode_cache
+    )
+
+    def datetime_fromtimestamp(timestamp):
+        """Convert Unix timestamp to datetime object"""
+        return datetime.datetime.fromtimestamp(timestamp)
+
+    def strftime(dt, format_str):
+        """Format datetime object using strftime"""
+        return dt.strftime(format_str)
+
+    def tojson_public(value):
+        """Serialize a value for the page with sensitive config keys removed"""
+        return jinja2.utils.htmlsafe_json_dumps(sanitize_config(value), **env.policies['json.dumps_kwargs'])
+
+    env.filters['datetime_fromtimestamp'] = datetime_fromtimestamp
+    env.filters['strftime'] = strftime
+    env.filters['tojson_public'] = tojson_public
+    return env
@@ -77,6 +77,7 @@ declare -A PACKAGE_VERSIONS=(
     ["python-dotenv"]="1.1.0"
     ["schedule"]="1.2.2"
     ["jinja2"]="3.1.6"
+    ["orjson"]="3.10.18"
 )
 
 # Install packages with specific versions
@@ -137,4 +138,12 @@ else
     print_info "No plugin dependencies will be installed."
 fi
 
+print_step "Precompiling page and plugin templates..."
+python "$INSTALL_DIR/backend/precompile_templates.py" > /dev/null
+chown -R $SUDO_USER:$SUDO_USER "$INSTALL_DIR/.jinja_compiled"
+# Older installs created the bytecode cache as root; the backend service needs to write it
+if [ -d "$INSTALL_DIR/.jinja_cache" ]; then
+    chown -R $SUDO_USER:$SUDO_USER "$INSTALL_DIR/.jinja_cache"
+fi
+
 print_header "INSTALLATION COMPLETE"
\ No newline at end of file